@@ -2,14 +2,21 @@
 # -*- coding: utf-8 -*-
 """
 Archive one-or-many public Matrix rooms.
-Creates  archive/<slug>/{index.html, room_log.txt}
+Creates  archive/<slug>/{index.html, room_log.txt}  (+ archive/style.css)
 plus a root index.html listing all rooms by their human titles.
 """
 
 # ── std-lib ────────────────────────────────────────────────────────────
-import os, sys, json, subprocess, shlex, hashlib, colorsys, logging, re, html
-import collections, pathlib, urllib.parse
+import os, sys, json, subprocess, shlex, zlib, logging, re, html, time
+import concurrent.futures, contextlib, functools, pathlib, urllib.parse, signal, threading, shutil
 from   datetime   import datetime, timezone
+from   operator   import itemgetter
+
+# ── optional ───────────────────────────────────────────────────────────
+try:    from orjson import loads as jloads, dumps as jdumps   # C codec, bytes in/out
+except ImportError:
+    from json import loads as jloads
+    jdumps = lambda o: json.dumps(o).encode()
 
 # ══════════════════════════  CONFIG  ═══════════════════════════════════
 HS, USER_ID, TOKEN = os.environ["MATRIX_HS"], os.environ["MATRIX_USER"], os.environ["MATRIX_TOKEN"]
@@ -21,6 +28,10 @@ if not ROOMS:
 LISTEN_MODE = os.getenv("LISTEN_MODE","all").lower()       # all|tail|once
 TAIL_N      = os.getenv("TAIL_N","10000")
 TIMEOUT_S   = int(os.getenv("TIMEOUT",20))
+WORKERS     = min(8,len(ROOMS))                            # rooms archived concurrently
+INCR_N      = int(os.getenv("INCR_N",1000))                # cached rooms: try this tail first (0 = off)
+WARMUP      = LISTEN_MODE=="all" and not os.getenv("SKIP_WARMUP")  # sync once before --listen all
+CACHE_DIR   = pathlib.Path(os.getenv("CACHE_DIR","cache"))    # events seen on earlier runs
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s", stream=sys.stderr)
 os.environ["NIO_LOG_LEVEL"] = "error"
@@ -29,195 +40,257 @@ os.environ["NIO_LOG_LEVEL"] = "error"
 cred_file = pathlib.Path("mc_creds.json")
 store_dir = pathlib.Path("store"); store_dir.mkdir(exist_ok=True)
 if not cred_file.exists():
-    cred_file.write_text(json.dumps({
-        "homeserver":HS,"user_id":USER_ID,"access_token":TOKEN,"device_id":"GH","default_room":ROOMS[0]}))
-CRED = ["--credentials", str(cred_file), "--store", str(store_dir)]
+    cred_file.write_bytes(jdumps({
+        "homeserver":HS,"user_id":USER_ID,"access_token":TOKEN,"device_id":"GH","default_room":ROOMS[0],"room_id":ROOMS[0]}))
+MC   = shutil.which("matrix-commander") or "matrix-commander"   # abs. path → posix_spawn
+# creds are shared read-only; each room gets its own store so parallel runs never share a db
+creds = lambda room: ["--credentials", str(cred_file), "--store", str(store_dir/slug(room))]
 
 # ═══════════════  tiny helpers  ═══════════════════════════════════════
-def run(cmd, timeout=None)->str:
-    res=subprocess.run(cmd, text=True, capture_output=True, timeout=timeout)
+# close_fds=False is safe (our fds are non-inheritable, PEP 446) and, with an
+# absolute executable, lets subprocess use posix_spawn instead of fork+exec.
+def run(cmd, timeout=None)->bytes:
+    res=subprocess.run(cmd, capture_output=True, timeout=timeout, close_fds=False)
     if res.returncode: raise subprocess.CalledProcessError(res.returncode,cmd,res.stdout,res.stderr)
     return res.stdout
 
-def json_lines(blob:str):
-    for ln in blob.splitlines():
-        if ln and ln[0] in "{[":
-            try: yield json.loads(ln)
-            except json.JSONDecodeError: pass
+def json_lines(lines, need=(b"",)):
+    for ln in lines:                                   # `need`: cheap bytes prefilter, any of
+        if ln[:1] in (b"{",b"[") and any(n in ln for n in need):
+            try: yield jloads(ln)
+            except ValueError: pass
+
+def stream(cmd, timeout=None, need=(b"",)):
+    """like run(), but yields JSON records while matrix-commander is still writing"""
+    p=subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1<<20, close_fds=False)
+    timer=threading.Timer(timeout, p.kill) if timeout else None
+    if timer: timer.start()
+    try:
+        with p: yield from json_lines(p.stdout, need)
+    finally:
+        if timer: timer.cancel()
+    if timer and p.returncode==-signal.SIGKILL: raise subprocess.TimeoutExpired(cmd,timeout)
+    if p.returncode: raise subprocess.CalledProcessError(p.returncode,cmd)
 
-when  = lambda e: datetime.utcfromtimestamp(e["origin_server_ts"]/1000)
+@contextlib.contextmanager
+def lines_to(path):
+    """yields put(line): utf-8 encodes each line straight into a 1 MiB-buffered file;
+    it only replaces `path` if the block finishes, so a failed render keeps the old page"""
+    tmp=path.with_suffix(".tmp")
+    try:
+        with open(tmp,"wb",buffering=1<<20) as f:
+            yield lambda ln: f.write(ln.encode()+b"\n")
+    except BaseException:
+        tmp.unlink(missing_ok=True); raise              # never leave a stray .tmp for git add
+    os.replace(tmp,path)
+
+@functools.lru_cache(maxsize=None)                   # chat bursts share a minute
+def minute(m:int)->str:                              # minutes since epoch → UTC stamp
+    t=time.gmtime(m*60)                              # f-string: no strftime format scan
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}"
+
+when  = lambda e: minute(e["origin_server_ts"]//60000)
 uname = lambda u: u.lstrip("@").split(":",1)[0]
 slug  = lambda s: urllib.parse.quote(s,safe="").replace("%","_")
 
+@functools.lru_cache(maxsize=None)                   # few senders, many messages
 def pastel(uid:str)->str:
-    d=hashlib.sha1(uid.encode()).digest()
-    h,l,s=int.from_bytes(d[:2],"big")/65535, .55+(d[2]/255-.5)*.25, .55+(d[3]/255-.5)*.25
-    r,g,b=colorsys.hls_to_rgb(h,l,s)
-    return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
+    d=zlib.crc32(uid.encode()).to_bytes(4,"big")       # 32 bits is all the colour needs
+    return "#"+bytes(140+c%90 for c in d[:3]).hex()    # each channel in 140..229 → pastel
+
+# page styles  ───────────────────────────────────────────────────────
+ACCENT, ACCENT_HOVER = "#64b5f6", "#90caf9"
+# one stylesheet for every room page, written once to archive/style.css
+ROOM_CSS = f"""\
+body{{margin:0 auto;max-width:75ch;font:15px/1.55 system-ui,-apple-system,'Segoe UI',Helvetica,Arial,sans-serif;
+     background:#141414;color:#e6e6e6;padding:2rem}}
+@media(max-width:480px){{body{{padding:1rem;font-size:14px}} pre{{font-size:13px}}}}
+.msg{{white-space:pre-wrap;margin:.3em 0}}
+.reply{{margin-left:2ch}}
+.edited{{opacity:.65;font-style:italic;font-size:.9em}}
+pre{{background:#1e1e1e;padding:.6em;border-radius:4px;overflow:auto}}
+code{{font-family:ui-monospace,monospace}}
+.u{{font-weight:600}}
+.ts,a.ts{{color:#888;text-decoration:none}}
+a.ts:hover{{color:#bbb}}
+a, a:visited{{color:{ACCENT}}}
+a:hover{{color:{ACCENT_HOVER}}}
+em{{font-style:italic}}
+"""
+LANDING_CSS = f"""
+body{{margin:0 auto;max-width:65ch;font:16px/1.55 system-ui,-apple-system,'Segoe UI',Helvetica,Arial,sans-serif;
+     background:#141414;color:#e6e6e6;padding:2rem}}
+a,a:visited{{color:{ACCENT}}}
+a:hover{{color:{ACCENT_HOVER}}}
+@media(max-width:480px){{body{{padding:1rem;font-size:15px}}}}
+"""
 
 # md-ish post-processing  ──────────────────────────────────────────────
-_re_mdlink = re.compile(r'\[([^\]]+?)\]\((https?://[^\s)]+)\)')
-_re_rawurl = re.compile(r'(?<!["\'>])(https?://[^\s<]+)')
-_re_fence  = re.compile(r'```(\w+)?\n([\s\S]*?)```', re.MULTILINE)
-_re_inline = re.compile(r'`([^`\n]+?)`')
-_re_italic = re.compile(r'(?<!\S)\*([^*\n]+?)\*(?!\S)')
-
-def linkify(t:str)->str:
-    t=_re_mdlink.sub(lambda m:f'<a href="{m.group(2)}" rel="noopener" target="_blank">{m.group(1)}</a>',t)
-    return _re_rawurl.sub(lambda m:f'<a href="{m.group(0)}" rel="noopener" target="_blank">{m.group(0)}</a>',t)
-
-def fmt(body:str)->str:
-    segs,pos=[],0
-    for fence in _re_fence.finditer(body):
-        segs.append(("txt",body[pos:fence.start()])); segs.append(("code",fence)); pos=fence.end()
-    segs.append(("txt",body[pos:]))
-
-    out=[]
-    for typ,part in segs:
-        if typ=="code":
-            lang = part.group(1) or ""
-            out.append(f"<pre><code class='{lang}'>{html.escape(part.group(2))}</code></pre>")
-            continue
-        chunk=html.escape(part)
-        chunk=_re_inline.sub(lambda m:f"<code>{html.escape(m.group(1))}</code>",chunk)
-        chunk=_re_italic.sub(r"<em>\1</em>",chunk)
-        out.append(linkify(chunk))
+# one alternation, one finditer per body; the match kind is m.lastgroup
+_code = r"`(?P<code>[^`\n]+?)`"
+_em   = r"(?<!\S)\*(?P<em>[^*\n]+?)\*(?!\S)"
+_re_md = re.compile(r"```(?P<lang>[\w+#.-]+)?\n"          # lang lands in class='…': no quotes, no spaces
+                    r"(?P<pre>[\s\S]*?)```"
+                    r"|"+_code+
+                    r"|\[(?P<text>[^\]]+?)\]\((?P<href>https?://[^\s)]+)\)"
+                    r"|(?P<url>https?://[^\s<>\"]+)"
+                    r"|"+_em)
+_re_span = re.compile(_code+"|"+_em)                     # link text: code / em, but no nested <a>
+_a = 'rel="noopener" target="_blank"'
+_md = {
+    "pre":  lambda m: f"<pre><code class='{m['lang'] or ''}'>{html.escape(m['pre'])}</code></pre>",
+    "code": lambda m: f"<code>{html.escape(m['code'])}</code>",
+    "href": lambda m: f'<a href="{html.escape(m["href"])}" {_a}>{fmt(m["text"],_re_span)}</a>',
+    "url":  lambda m: f'<a href="{html.escape(m["url"])}" {_a}>{html.escape(m["url"])}</a>',
+    "em":   lambda m: f"<em>{fmt(m['em'],m.re)}</em>",     # same pattern inside *…*
+}
+
+def fmt(body:str, rx=_re_md)->str:
+    out,pos=[],0
+    for m in rx.finditer(body):
+        out.append(html.escape(body[pos:m.start()])); out.append(_md[m.lastgroup](m)); pos=m.end()
+    out.append(html.escape(body[pos:]))
     return "".join(out)
 
 # ═══════════════  archiver  ═══════════════════════════════════════════
 def archive(room:str):
     logging.info("room %s", room)
-    cred=json.loads(cred_file.read_text()); cred.update(room_id=room,default_room=room)
-    cred_file.write_text(json.dumps(cred))
-
+    (store_dir/slug(room)).mkdir(exist_ok=True)
     rdir=pathlib.Path("archive")/slug(room); rdir.mkdir(parents=True, exist_ok=True)
 
-    for cmd in (["--room-join",room],["--room",room,"--listen","once"]):
-        try: run(["matrix-commander",*CRED,*cmd])
-        except subprocess.CalledProcessError as e:
-            logging.warning("Command %s failed for room %s: exit code %d", " ".join(cmd[-2:]), room, e.returncode)
-            if e.stderr:
-                logging.warning("Error details: %s", e.stderr)
+    # join, room info and warm-up sync in one process (room actions run before --listen);
+    # tail/once do their own sync in the fetch below, so only "all" needs the warm-up
+    warm=["--listen","once"] if WARMUP else []
+    try: out=run([MC,*creds(room),"--room-join",room,"--room",room,"--get-room-info",room,
+                  *warm,"--output","json"])
+    except subprocess.CalledProcessError as e:
+        logging.warning("Join/sync failed for room %s: exit code %d", room, e.returncode)
+        if e.stderr:
+            logging.warning("Error details: %s", e.stderr.decode(errors="replace"))
+        out=e.stdout or b""
 
     title=room
-    try:
-        info=next(json_lines(run(["matrix-commander",*CRED,"--room",room,
-                                  "--get-room-info","--output","json"])),{})
-        for k in("room_display_name","room_name","canonical_alias","room_alias"):
-            if info.get(k): title=info[k];break
-    except Exception: pass
-
-    mode={"all":["all"],"tail":["tail","--tail",TAIL_N],"once":["once"]}[LISTEN_MODE]
-    raw=run(["matrix-commander",*CRED,"--room",room,"--listen",*mode,"--listen-self","--output","json"],
-            timeout=TIMEOUT_S if LISTEN_MODE=="all" else None)
-
-    originals, edits={},{}
-    for j in json_lines(raw):
-        ev=j.get("source",j)
-        if ev.get("type")!="m.room.message": continue
-        rel=ev["content"].get("m.relates_to",{})
-        if rel.get("rel_type")=="m.replace" or "m.new_content" in ev["content"]:
-            edits[rel.get("event_id")]=ev
-        else:
-            originals[ev["event_id"]]=ev
-    for eid,msg in originals.items():
-        if eid in edits:
-            rep=edits[eid]
-            new_body=rep["content"].get("m.new_content",{}).get("body") or rep["content"].get("body","")
-            msg["content"]["body"]=new_body; msg["_edited"]=True
+    # best-effort: a malformed info record only drops the title back to the room id
+    info=next((j for j in json_lines(out.splitlines())
+               if isinstance(j,dict) and "event_id" not in j.get("source",j)),{})
+    for k in("room_display_name","room_name","canonical_alias","room_alias"):
+        if isinstance(info.get(k),str) and info[k]: title=info[k];break
+
+    cache=CACHE_DIR/f"{slug(room)}.json"
+    try:    saved=jloads(cache.read_bytes())
+    except (OSError,ValueError): saved={}
+    originals={e["event_id"]:e for e in saved.get("events",())}
+    complete=bool(saved.get("complete"))                   # a full --listen all has been merged
+
+    # json-spec: just the raw event per line; "json" would re-serialise the whole room
+    # (member list included) into every single message record
+    fetch=lambda mode,timeout=None: stream(
+        [MC,*creds(room),"--room",room,"--listen",*mode,"--listen-self","--output","json-spec"],
+        timeout=timeout, need=(b'"m.room.message"',b'"m.room.redaction"'))
+
+    edits={}                                              # target id → newest edited body
+    def merge(recs)->bool:                                # True once a cached message shows up again
+        overlap=False
+        for j in recs:
+            if not isinstance(j,dict): continue             # json_lines also yields [...] lines
+            ev=j.get("source",j); typ=ev.get("type")
+            if typ=="m.room.redaction":                     # deletions only ever reach us this way
+                originals.pop(ev.get("redacts") or ev.get("content",{}).get("redacts"),None); continue
+            if typ!="m.room.message": continue
+            if "redacted_because" in ev.get("unsigned",{}):  # stripped copy of a deleted message
+                originals.pop(ev["event_id"],None); continue
+            c=ev["content"]; rel=c.get("m.relates_to",{})
+            if rel.get("rel_type")=="m.replace" or "m.new_content" in c:
+                eid=rel.get("event_id"); msg=originals.get(eid)
+                edits[eid]=c.get("m.new_content",{}).get("body") or c.get("body","")
+            else:
+                eid=ev["event_id"]; overlap|=eid in originals; msg=originals[eid]=ev
+            if msg is not None and eid in edits:            # edit may land before or after its original
+                msg["content"]["body"]=edits[eid]; msg["_edited"]=True
+        return overlap
 
-    events=sorted(originals.values(),key=when);  # nothing? bail
-    if not events: return None
+    # with a complete cache, a short tail usually reaches back to what we already have;
+    # only a gap (tail overlaps nothing) pays for the full history again
+    if LISTEN_MODE=="all" and INCR_N and complete and merge(fetch(["tail","--tail",str(INCR_N)],TIMEOUT_S)):
+        logging.info("  incremental: %d cached events reached", len(originals))
+    else:
+        mode={"all":["all"],"tail":["tail","--tail",TAIL_N],"once":["once"]}[LISTEN_MODE]
+        overlap=merge(fetch(mode, TIMEOUT_S if LISTEN_MODE=="all" else None))
+        complete=LISTEN_MODE=="all" or (complete and overlap)   # tail/once may leave a gap
+    CACHE_DIR.mkdir(exist_ok=True)
+    cache.write_bytes(jdumps({"complete":complete,"events":list(originals.values())}))
+
+    events=sorted(originals.values(),key=itemgetter("origin_server_ts"))  # int ms, C key
+    if not events: return None                                            # nothing? bail
 
     # 1-level threads
-    byid,threads={e["event_id"]:e for e in events},collections.defaultdict(list)
+    byid,threads,roots,at={},{},[],{}   # at: shared by txt + html
     for e in events:
+        eid=e["event_id"]; byid[eid]=e; at[eid]=when(e)
+        e["sender"]=sys.intern(e["sender"])                # one str per user, not per message
         rel=e["content"].get("m.relates_to",{})
-        if rel.get("rel_type")=="m.thread": threads[rel["event_id"]].append(e["event_id"])
-    roots=[e for e in events if e["event_id"] not in {c for kids in threads.values() for c in kids}]
-
-    # plain-text (for git / LLM)
-    stamp=datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    plain=[f"# room: {title}",f"# exported: {stamp}"]
-    def add_txt(ev,lvl):
-        body=ev["content"].get("body","")
-        if ev.get("_edited"): body+=" [edited]"
-        plain.append(f"{'  '*lvl}{'↳ ' if lvl else ''}{when(ev).strftime('%Y-%m-%d %H:%M')} "
-                     f"{uname(ev['sender'])}: {body}")
-    for r in roots:
-        add_txt(r,0)
-        for cid in threads[r["event_id"]]: add_txt(byid[cid],1)
-
-    # html
-    accent="#64b5f6"; accent_hover="#90caf9"    # << new palette
-    last=datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    style=f"""
-<style>
-body{{margin:0 auto;max-width:75ch;font:15px/1.55 system-ui,-apple-system,'Segoe UI',Helvetica,Arial,sans-serif;
-     background:#141414;color:#e6e6e6;padding:2rem}}
-@media(max-width:480px){{body{{padding:1rem;font-size:14px}} pre{{font-size:13px}}}}
-.msg{{white-space:pre-wrap;margin:.3em 0}}
-.reply{{margin-left:2ch}}
-.edited{{opacity:.65;font-style:italic;font-size:.9em}}
-pre{{background:#1e1e1e;padding:.6em;border-radius:4px;overflow:auto}}
-code{{font-family:ui-monospace,monospace}}
-.u{{font-weight:600}}
-.ts,a.ts{{color:#888;text-decoration:none}}
-a.ts:hover{{color:#bbb}}
-a, a:visited{{color:{accent}}}
-a:hover{{color:{accent_hover}}}
-em{{font-style:italic}}
-</style>"""
-    html_lines=[
+        if rel.get("rel_type")=="m.thread": threads.setdefault(rel["event_id"],[]).append(eid)
+        else: roots.append(e)
+
+    # page chrome
+    stamp=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    header=[
         "<!doctype html><meta charset=utf-8><meta name=viewport content='width=device-width,initial-scale=1'>",
-        f"<title>{html.escape(title)} – archive</title>", style,
+        f"<title>{html.escape(title)} – archive</title>", "<link rel=stylesheet href='../style.css'>",
         f"<h1>{html.escape(title)}</h1>",
-        f"<p><small>last updated {last}</small></p>",
+        f"<p><small>last updated {stamp}</small></p>",
         f"<p><a href='room_log.txt'>⇩ plaintext</a> · <a href='../../'>⇦ all rooms</a></p>",
         "<hr>"
     ]
-    def add_html(ev,lvl):
-        cls="msg"+(" reply" if lvl else "")
-        body=fmt(ev["content"].get("body",""))
-        if ev.get("_edited"): body+=' <span class="edited">(edited)</span>'
-        eid=ev["event_id"]
-        ts=f"<a class='ts' href='#{eid}'>#</a> <a class='ts' name='{eid}' href='https://matrix.to/#/{room}/{eid}' target='_blank'>" \
-           f"{when(ev).strftime('%Y-%m-%d %H:%M')}</a>"
-        html_lines.append(f"<div class='{cls}'>{ts}&ensp;"
-                          f"<span class='u' style='color:{pastel(ev['sender'])}'>{uname(ev['sender'])}</span>: "
-                          f"{body}</div>")
-    for r in roots:
-        add_html(r,0)
-        for cid in threads[r["event_id"]]: add_html(byid[cid],1)
-
-    (rdir/"room_log.txt").write_text("\n".join(plain)+"\n",encoding="utf-8")
-    (rdir/"index.html").write_text("\n".join(html_lines)+"\n",encoding="utf-8")
+    indent=("","  ↳ ")                                     # by thread level
+    div=("<div class='msg'>","<div class='msg reply'>")
+    tag_txt,tag_html=("", " [edited]"),("", ' <span class="edited">(edited)</span>')  # by _edited
+    permalink=f"https://matrix.to/#/{room}/"
+    # sender → nick / coloured badge, built once per sender rather than per message
+    nick={u:uname(u) for u in {e["sender"] for e in events}}
+    badge={u:f"<span class='u' style='color:{pastel(u)}'>{html.escape(n)}</span>" for u,n in nick.items()}
+
+    # one walk over the thread tree feeds both the plain text (for git / LLM) and the html
+    with lines_to(rdir/"room_log.txt") as plain, lines_to(rdir/"index.html") as page:
+        plain(f"# room: {title}"); plain(f"# exported: {stamp}")
+        for ln in header: page(ln)
+        def emit(ev,lvl):
+            body,eid,who=ev["content"].get("body"),ev["event_id"],ev["sender"]
+            if not isinstance(body,str): body=""           # null / non-text body from a client
+            edited=bool(ev.get("_edited"))
+            plain(f"{indent[lvl]}{at[eid]} {nick[who]}: {body}{tag_txt[edited]}")
+            page(f"{div[lvl]}<a class='ts' href='#{eid}'>#</a> "
+                 f"<a class='ts' name='{eid}' href='{permalink}{eid}' target='_blank'>"
+                 f"{at[eid]}</a>&ensp;"
+                 f"{badge[who]}: {fmt(body)}{tag_html[edited]}</div>")
+        if not threads:                                    # common case: flat room
+            for r in roots: emit(r,0)
+        else:
+            for r in roots:
+                emit(r,0)
+                for cid in threads.get(r["event_id"],()): emit(byid[cid],1)
+
     logging.info("  wrote → %s", rdir)
     return title, room, slug(room)
 
 # ═══════════════════════════════  MAIN  ═══════════════════════════════
 pathlib.Path("archive").mkdir(exist_ok=True)
 (pathlib.Path("archive/index.html")).unlink(missing_ok=True)
+pathlib.Path("archive/style.css").write_text(ROOM_CSS, encoding="utf-8")
 
-meta=[]
-for rid in ROOMS:
-    try:
-        m=archive(rid)
-        if m: meta.append(m)
+def archive_logged(rid:str):
+    try: return archive(rid)
     except Exception as exc:
         logging.error("‼ failed for %s – %s", rid, exc)
 
+# rooms are independent and mostly wait on matrix-commander, so threads are enough
+with concurrent.futures.ThreadPoolExecutor(max_workers=WORKERS) as pool:
+    meta=[m for m in pool.map(archive_logged, ROOMS) if m]
+
 meta.sort(key=lambda t:t[0].lower())
-accent="#64b5f6"; accent_hover="#90caf9"
 landing=f"""<!doctype html><meta charset=utf-8><meta name=viewport content='width=device-width,initial-scale=1'>
 <title>Archived rooms</title>
-<style>
-body{{margin:0 auto;max-width:65ch;font:16px/1.55 system-ui,-apple-system,'Segoe UI',Helvetica,Arial,sans-serif;
-     background:#141414;color:#e6e6e6;padding:2rem}}
-a,a:visited{{color:{accent}}}
-a:hover{{color:{accent_hover}}}
-@media(max-width:480px){{body{{padding:1rem;font-size:15px}}}}
-</style>
+<style>{LANDING_CSS}</style>
 <h1>Archived rooms</h1>
 <ul>
 {"".join(f"<li><a href='archive/{s}/index.html'>{html.escape(t)}</a><br><small>{html.escape(r)}</small></li>" for t,r,s in meta)}